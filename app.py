@@ -6,16 +6,25 @@ Uses voice calibration and OpenAI Whisper for analysis.
 """
 
 import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import numpy as np
+import pandas as pd
+import itertools
+import queue
+import threading
 import time
-import tempfile
 import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
+from streamlit_autorefresh import st_autorefresh
 
 from audio_recorder import (
-    record_audio, save_audio, save_to_temp_file,
-    calculate_rms, SAMPLE_RATE, get_audio_devices, get_audio_level
+    record_audio, save_audio, audio_to_wav_bytes,
+    calculate_rms_and_peak, calculate_zcr, SAMPLE_RATE, get_audio_devices,
+    ChunkRecorder, InputMonitor, get_input_monitor, release_input_monitor
 )
 from voice_matcher import (
     create_voice_profile, match_voice, VoiceProfile,
@@ -29,18 +38,39 @@ from speaker_id import (
     load_embedding,
     match_embedding,
 )
+from vad import speech_regions, speech_only
 
 # Load .env file from project directory
 APP_DIR = Path(__file__).parent
 ENV_PATH = APP_DIR / ".env"
 PROFILE_PATH = APP_DIR / "voice_profile.json"
-SPEAKER_EMBEDDING_PATH = APP_DIR / "speaker_embedding.json"
+SPEAKER_EMBEDDING_PATH = APP_DIR / "speaker_embedding.npy"
+LEGACY_SPEAKER_EMBEDDING_PATH = APP_DIR / "speaker_embedding.json"  # Migrated on load
 
 if ENV_PATH.exists():
     load_dotenv(ENV_PATH)
 
 HUGGING_FACE_API_KEY = os.getenv("HUGGING_FACE_API_KEY")
 
+CHUNK_DURATION = 2.0  # Seconds of audio per speaker decision
+SPEECH_THRESHOLD = 0.005  # Lowered threshold for speech detection
+TRACKING_REFRESH_MS = 1000  # UI refresh interval while tracking
+LEVEL_REFRESH_INTERVAL = "0.3s"  # Level meter refresh while idle
+MONITOR_WATCH_INTERVAL = 1.0  # Seconds between checks that a session still holds the mic
+TRANSCRIBE_BATCH_CHUNKS = 8  # Max speech chunks (~16 s) per Whisper call
+# Zero-crossing rate band for voice at 16 kHz; loud chunks outside it
+# (hum, clicks, hiss) skip speaker matching
+VOICE_ZCR_MIN = 0.01
+VOICE_ZCR_MAX = 0.3
+# While one speaker holds the floor, reuse the last decision for this many
+# chunks between matches; confidence must stay within the delta of its EMA
+MATCH_REUSE_CHUNKS = 1
+MATCH_STABLE_DELTA = 0.1
+# Bounded session buffers so long sessions do not grow without limit
+DEBUG_LOG_LIMIT = 20
+TRANSCRIPT_LIMIT = 200
+HISTORY_LIMIT = 3600  # ~2 hours of speech chunks
+
 
 # Page config
 st.set_page_config(
@@ -80,23 +110,85 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Big percentage display, formatted with (color, percentage) on each rerun
+PERCENTAGE_HTML = """
+    <div style="text-align: center; padding: 2rem;">
+        <div style="font-size: 5rem; font-weight: 700; color: {0};">
+            {1:.0f}%
+        </div>
+        <div style="font-size: 1.2rem; color: #666;">
+            Your speaking time
+        </div>
+    </div>
+"""
+
+
+@st.cache_resource(show_spinner="Loading Whisper model...")
+def get_whisper_client(model_size: str = "base.en") -> WhisperClient:
+    """Load the Whisper model once per process and share it across sessions."""
+    return WhisperClient(model_size=model_size)
+
+
+@st.cache_resource(show_spinner="Loading speaker embedding model...")
+def get_speaker_embedder(auth_token: str) -> SpeakerEmbedder:
+    """
+    Load the speaker embedding model once per process and share it across sessions.
+
+    The match threshold is passed per call, so it is not part of the cache key.
+    """
+    return SpeakerEmbedder(config=SpeakerEmbeddingConfig(), auth_token=auth_token)
+
+
+def _load_speaker_embedder():
+    """Return the shared speaker embedder, or None if it is unavailable."""
+    if not HUGGING_FACE_API_KEY:
+        return None
+    try:
+        return get_speaker_embedder(HUGGING_FACE_API_KEY)
+    except Exception as e:
+        st.session_state.speaker_embedding_error = f"Speaker embedding error: {str(e)[:80]}"
+        return None
+
+
+def _load_whisper_client():
+    """Return the shared Whisper client, or None (transcription off) if it fails to load."""
+    try:
+        return get_whisper_client()
+    except Exception as e:
+        st.session_state.transcription_error = f"Whisper model error: {str(e)[:80]}"
+        st.session_state.transcription_enabled = False
+        return None
+
+
+@st.cache_data(show_spinner=False)
+def _cached_audio_devices() -> list[dict]:
+    """
+    Enumerate input devices once, shared across sessions and reruns.
+
+    PortAudio keeps the device list it read at startup, so querying again
+    does not find new microphones; the cache is only cleared by Refresh.
+    """
+    return get_audio_devices()
+
 
 def init_session_state():
     """Initialize session state variables."""
-    if 'whisper_client' not in st.session_state:
-        st.session_state.whisper_client = None
-    if 'speaker_embedder' not in st.session_state:
-        st.session_state.speaker_embedder = None
     if 'speaker_embedding' not in st.session_state:
-        if SPEAKER_EMBEDDING_PATH.exists():
+        embedding_path = SPEAKER_EMBEDDING_PATH
+        if not embedding_path.exists():
+            embedding_path = LEGACY_SPEAKER_EMBEDDING_PATH
+        if embedding_path.exists():
             try:
-                st.session_state.speaker_embedding = load_embedding(str(SPEAKER_EMBEDDING_PATH))
+                st.session_state.speaker_embedding = load_embedding(str(embedding_path))
+                if embedding_path == LEGACY_SPEAKER_EMBEDDING_PATH:
+                    save_embedding(st.session_state.speaker_embedding, str(SPEAKER_EMBEDDING_PATH))
+                    embedding_path.unlink()
             except Exception as e:
                 print(f"Failed to load speaker embedding: {e}")
                 st.session_state.speaker_embedding = None
                 st.session_state.speaker_embedding_error = "Failed to load speaker embedding."
                 try:
-                    SPEAKER_EMBEDDING_PATH.unlink()
+                    embedding_path.unlink()
                 except Exception:
                     pass
         else:
@@ -108,7 +200,7 @@ def init_session_state():
     if 'speaker_similarity_threshold' not in st.session_state:
         st.session_state.speaker_similarity_threshold = 0.65
     if 'debug_logs' not in st.session_state:
-        st.session_state.debug_logs = []
+        st.session_state.debug_logs = deque(maxlen=DEBUG_LOG_LIMIT)
     if 'voice_profile' not in st.session_state:
         # Try to load saved profile
         if PROFILE_PATH.exists():
@@ -137,23 +229,97 @@ def init_session_state():
     if 'total_time' not in st.session_state:
         st.session_state.total_time = 0.0
     if 'transcription' not in st.session_state:
-        st.session_state.transcription = []
+        st.session_state.transcription = deque(maxlen=TRANSCRIPT_LIMIT)
     if 'percentage_history' not in st.session_state:
-        st.session_state.percentage_history = []
+        st.session_state.percentage_history = deque(maxlen=HISTORY_LIMIT)
+    if 'chart_data' not in st.session_state:
+        st.session_state.chart_data = None
     if 'selected_device' not in st.session_state:
         st.session_state.selected_device = None
-    if 'audio_devices' not in st.session_state:
-        st.session_state.audio_devices = get_audio_devices()
     if 'transcription_enabled' not in st.session_state:
         st.session_state.transcription_enabled = False  # Off by default for fully local operation
-
-
+    if 'transcription_error' not in st.session_state:
+        st.session_state.transcription_error = None
+    if 'capture_started' not in st.session_state:
+        st.session_state.capture_started = False
+    if 'loud_chunks' not in st.session_state:
+        st.session_state.loud_chunks = 0
+    if 'nonvoice_chunks' not in st.session_state:
+        st.session_state.nonvoice_chunks = 0
+    if 'tracking_results' not in st.session_state:
+        st.session_state.tracking_results = queue.SimpleQueue()
+    if 'tracking_settings' not in st.session_state:
+        st.session_state.tracking_settings = None
+    if 'tracking_recorder' not in st.session_state:
+        st.session_state.tracking_recorder = None
+    if 'tracking_stop_event' not in st.session_state:
+        st.session_state.tracking_stop_event = None
+    if 'tracking_worker' not in st.session_state:
+        st.session_state.tracking_worker = None
+    if 'tracking_device' not in st.session_state:
+        st.session_state.tracking_device = None
+    if 'level_meter_failed' not in st.session_state:
+        st.session_state.level_meter_failed = False
+    if 'monitor_watcher' not in st.session_state:
+        st.session_state.monitor_watcher = None
+
+
+def _session_id() -> str | None:
+    """Id of the browser session running this script, None outside Streamlit."""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+
+def _watch_input_monitor(session_id: str) -> None:
+    """Release the session's input monitor once the browser session has ended."""
+    while _session_active(session_id):
+        time.sleep(MONITOR_WATCH_INTERVAL)
+    release_input_monitor(session_id)
+
+
+def _input_monitor() -> InputMonitor:
+    """
+    Open (or reuse) the selected device's input monitor for this session.
+
+    The stream keeps recording into its ring buffer while open, so a watcher
+    thread releases it when the tab is closed rather than leaving the
+    microphone on for the life of the server.
+    """
+    session_id = _session_id()
+    monitor = get_input_monitor(st.session_state.selected_device, session_id)
+    watcher = st.session_state.monitor_watcher
+    if session_id is not None and (watcher is None or not watcher.is_alive()):
+        watcher = threading.Thread(target=_watch_input_monitor, args=(session_id,), daemon=True)
+        watcher.start()
+        st.session_state.monitor_watcher = watcher
+    return monitor
+
+
+def _current_audio_level() -> float:
+    """Read the level meter from the persistent stream on the selected device."""
+    try:
+        level = _input_monitor().level
+    except Exception as e:
+        # Polled several times a second: report a failing device only once
+        if not st.session_state.level_meter_failed:
+            print(f"Failed to open input stream: {e}")
+            st.session_state.level_meter_failed = True
+        return 0.0
+    st.session_state.level_meter_failed = False
+    return level
+
+
+@st.fragment(run_every=LEVEL_REFRESH_INTERVAL)
+def _level_meter() -> None:
+    """Live audio level bar; reruns on its own without rerunning the page."""
+    level = _current_audio_level()
+    st.progress(level, text=f"Level: {level:.0%}")
 
 
 def _render_device_selector(selectbox_key: str) -> None:
     """Render the audio device selection sidebar widgets."""
     st.markdown("### Audio Input")
-    devices = st.session_state.audio_devices
+    devices = _cached_audio_devices()
     device_names = [d['name'] for d in devices]
     device_ids = [d['id'] for d in devices]
 
@@ -172,7 +338,7 @@ def _render_device_selector(selectbox_key: str) -> None:
         st.session_state.selected_device = device_ids[selected_idx]
 
     if st.button("🔄 Refresh Devices"):
-        st.session_state.audio_devices = get_audio_devices()
+        _cached_audio_devices.clear()
         st.rerun()
 
 
@@ -185,12 +351,9 @@ def render_calibration():
     st.markdown('<p class="main-header">Voice Calibration</p>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">Record a sample of your voice so we can identify you</p>', unsafe_allow_html=True)
 
-    # Audio level indicator (manual refresh to avoid rerun flicker)
+    # Audio level indicator
     st.markdown("**Audio Level** - speak to verify your mic is working")
-    level_container = st.empty()
-    st.button("🔄 Refresh Level", key="calibration_refresh_level")
-    level = get_audio_level(0.15, st.session_state.selected_device)
-    level_container.progress(level, text=f"Level: {level:.0%}")
+    _level_meter()
 
     st.markdown("""
     **Instructions:**
@@ -218,7 +381,7 @@ def render_calibration():
                 with st.spinner("Recording for 10 seconds... Speak now!"):
                     # Record continuously to avoid gaps between chunks
                     st.session_state.calibration_audio = record_audio(
-                        10.0, SAMPLE_RATE, st.session_state.selected_device
+                        10.0, SAMPLE_RATE, st.session_state.selected_device, owner=_session_id()
                     )
                     st.rerun()
             else:
@@ -226,9 +389,9 @@ def render_calibration():
         else:
             st.success("Recording complete!")
 
-            # Save to temp file for playback
-            temp_path = save_to_temp_file(st.session_state.calibration_audio, SAMPLE_RATE)
-            st.audio(temp_path, format="audio/wav")
+            # Encode in memory for playback
+            wav_bytes = audio_to_wav_bytes(st.session_state.calibration_audio, SAMPLE_RATE)
+            st.audio(wav_bytes, format="audio/wav")
 
             col_a, col_b = st.columns(2)
 
@@ -251,15 +414,8 @@ def render_calibration():
                         st.session_state.speaker_embedding_error = None
                         if HUGGING_FACE_API_KEY:
                             try:
-                                if st.session_state.speaker_embedder is None:
-                                    config = SpeakerEmbeddingConfig(
-                                        similarity_threshold=st.session_state.speaker_similarity_threshold
-                                    )
-                                    st.session_state.speaker_embedder = SpeakerEmbedder(
-                                        config=config,
-                                        auth_token=HUGGING_FACE_API_KEY
-                                    )
-                                embedding = st.session_state.speaker_embedder.embedding_from_audio(
+                                embedder = get_speaker_embedder(HUGGING_FACE_API_KEY)
+                                embedding = embedder.embedding_from_audio(
                                     st.session_state.calibration_audio,
                                     SAMPLE_RATE
                                 )
@@ -271,13 +427,375 @@ def render_calibration():
                         st.session_state.calibration_audio = None
                         st.rerun()
 
-    # No auto-refresh in calibration to avoid duplicate buttons / interrupted clicks.
+    # Only the level meter fragment refreshes here; the page itself is never
+    # auto-rerun, so the recording buttons are not duplicated or interrupted.
+
+
+def _classify_chunk(audio: np.ndarray, settings: dict, match_state: dict) -> dict:
+    """
+    Decide whether a recorded chunk is speech and, if so, whether it is the user.
+
+    Runs on the tracking thread, so it only reads and writes ``settings`` and
+    ``match_state`` and never touches ``st.session_state``.
+    """
+    rms, audio_max = calculate_rms_and_peak(audio)
+    result = {"rms": rms, "is_user": False, "dur": 0.0, "transcript": [],
+              "embedding_error": None, "nonvoice": False}
+
+    # Log audio stats
+    log_entry = f"RMS: {rms:.4f} | Max: {audio_max:.4f}"
+
+    if rms <= SPEECH_THRESHOLD:
+        # A pause is a likely turn change: re-check the next speech chunk
+        match_state["stable"] = False
+        result["log"] = log_entry + " | (silence)"
+        return result
+
+    # Voice activity detection: only the speech itself is matched and counted
+    regions = speech_regions(audio)
+    if not regions:
+        match_state["stable"] = False
+        result["nonvoice"] = True
+        result["log"] = log_entry + " | no speech (VAD)"
+        return result
+    speech = speech_only(audio, regions)
+
+    # Loud but clearly not a voice (hum, clicks, hiss) that got past the VAD.
+    # Measured on the speech regions only: hiss around a short phrase would
+    # push a whole chunk's rate over the band. Like silence, it is not counted.
+    zcr = calculate_zcr(speech)
+    if zcr < VOICE_ZCR_MIN or zcr > VOICE_ZCR_MAX:
+        match_state["stable"] = False
+        result["nonvoice"] = True
+        result["log"] = log_entry + f" | ZCR: {zcr:.2f} (non-voice)"
+        return result
+    speech_dur = len(speech) / SAMPLE_RATE
+    log_entry += f" | SPEECH {speech_dur:.1f}s"
+
+    # Same speaker still talking with steady confidence: reuse the decision
+    if match_state["stable"] and match_state["chunks_since_check"] < MATCH_REUSE_CHUNKS:
+        match_state["chunks_since_check"] += 1
+        is_user = match_state["last_is_user"]
+        log_entry += f" | reused: {match_state['conf_ema']:.2f} | IsYou: {is_user}"
+        result["is_user"] = is_user
+        result["dur"] = speech_dur
+        result["log"] = log_entry
+        return result
+
+    # Match against profile (prefer speaker embedding if available)
+    is_user = False
+    confidence = 0.0
+    match_method = "gmm"
+    used_embedding = False
+
+    embedder = settings["speaker_embedder"]
+    if settings["use_embedding"] and settings["speaker_embedding"] is not None and embedder is not None:
+        try:
+            is_user, confidence = match_embedding(
+                speech,
+                SAMPLE_RATE,
+                embedder,
+                settings["speaker_embedding"],
+                threshold=settings["similarity_threshold"],
+            )
+            match_method = "embedding"
+            used_embedding = True
+        except Exception as e:
+            result["embedding_error"] = f"Speaker embedding error: {str(e)[:80]}"
+            settings["speaker_embedder"] = None
+
+    if not used_embedding:
+        is_user, confidence = match_voice(
+            speech,
+            settings["voice_profile"],
+            SAMPLE_RATE
+        )
+
+    # Stable when this check agrees with the previous one and its confidence
+    # sits close to the running average
+    conf_ema = match_state["conf_ema"]
+    match_state["stable"] = (
+        conf_ema is not None
+        and match_state["method"] == match_method
+        and match_state["last_is_user"] == is_user
+        and abs(confidence - conf_ema) < MATCH_STABLE_DELTA
+    )
+    if conf_ema is None or match_state["method"] != match_method:
+        match_state["conf_ema"] = confidence
+    else:
+        match_state["conf_ema"] = 0.7 * conf_ema + 0.3 * confidence
+    match_state["method"] = match_method
+    match_state["last_is_user"] = is_user
+    match_state["chunks_since_check"] = 0
+
+    log_entry += f" | {match_method}: {confidence:.2f} | IsYou: {is_user}"
+    result["is_user"] = is_user
+    result["dur"] = speech_dur
+    result["log"] = log_entry
+    return result
+
+
+def _label_segments(segments: list[dict], speaker_tags: list[bool]) -> list[str]:
+    """
+    Attribute Whisper segments to "You"/"Other" using the per-chunk decisions.
+
+    Each segment is assigned to the chunk containing its midpoint; consecutive
+    segments from the same speaker are merged into one line.
+    """
+    lines = []
+    last_speaker = None
+    for segment in segments:
+        text = segment.get("text", "").strip()
+        if not text:
+            continue
+        midpoint = (segment["start"] + segment["end"]) / 2
+        chunk_idx = min(int(midpoint // CHUNK_DURATION), len(speaker_tags) - 1)
+        speaker = "You" if speaker_tags[chunk_idx] else "Other"
+        if speaker == last_speaker:
+            lines[-1] += f" {text}"
+        else:
+            lines.append(f"**{speaker}:** {text}")
+            last_speaker = speaker
+    return lines
+
+
+def _transcribe_batch(audio_chunks: list[np.ndarray], speaker_tags: list[bool], settings: dict) -> dict:
+    """Transcribe buffered speech chunks with a single Whisper call."""
+    result = {"rms": 0.0, "is_user": False, "dur": 0.0, "transcript": [],
+              "embedding_error": None, "nonvoice": False}
+    log_entry = f"Transcribe {len(audio_chunks)} chunks"
+
+    if settings["whisper_client"] is None:
+        result["log"] = log_entry + " | Whisper model not loaded"
+        return result
+
+    try:
+        # Whisper takes 16kHz float32 samples directly, no temp WAV needed
+        transcript = settings["whisper_client"].transcribe(np.concatenate(audio_chunks))
+
+        if transcript["success"] and transcript["text"].strip():
+            result["transcript"] = _label_segments(transcript["segments"], speaker_tags)
+            log_entry += f" | Text: {transcript['text'][:30]}..."
+    except Exception as e:
+        log_entry += f" | Transcribe error: {str(e)[:30]}"
+
+    result["log"] = log_entry
+    return result
+
+
+def _publish_transcript(audio_chunks: list[np.ndarray], speaker_tags: list[bool],
+                        settings: dict, results: queue.SimpleQueue) -> None:
+    """Transcribe a batch on the transcription thread and publish the result."""
+    results.put(_transcribe_batch(audio_chunks, speaker_tags, settings))
+
+
+def _queue_transcript(transcriber: ThreadPoolExecutor, waiting: Future | None,
+                      audio_chunks: list[np.ndarray], speaker_tags: list[bool],
+                      settings: dict, results: queue.SimpleQueue) -> tuple[Future, bool]:
+    """
+    Queue a batch behind the one being transcribed, keeping at most one waiting.
+
+    If Whisper is slower than real time, the batch still waiting from last time
+    is dropped (like ChunkRecorder drops its oldest chunk), so the backlog and
+    transcript latency stay bounded.
+
+    Returns:
+        Tuple of (future of the queued batch, whether a waiting batch was dropped)
+    """
+    dropped = waiting is not None and waiting.cancel()
+    future = transcriber.submit(_publish_transcript, audio_chunks, speaker_tags,
+                                settings, results)
+    return future, dropped
+
+
+def _session_active(session_id: str | None) -> bool:
+    """Whether the browser session that started tracking is still connected."""
+    if session_id is None or not runtime.exists():
+        return True
+    return runtime.get_instance().is_active_session(session_id)
+
+
+def _tracking_worker(recorder: ChunkRecorder, results: queue.SimpleQueue,
+                     stop_event: threading.Event, settings: dict,
+                     session_id: str | None) -> None:
+    """Classify recorded chunks and publish the results until stopped."""
+    # Speech is buffered and sent to Whisper in batches: per-call overhead
+    # dominates on 2-second clips. Batches run on their own thread so a slow
+    # transcription does not stall classification and overflow the recorder.
+    transcriber = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcribe")
+    waiting_batch = None
+    dropped_batches = 0
+    pending_audio = []
+    pending_speaker_tags = []
+    match_state = {
+        "conf_ema": None,
+        "method": None,
+        "last_is_user": False,
+        "stable": False,
+        "chunks_since_check": 0,
+    }
+
+    while not stop_event.is_set():
+        # Nobody can press Stop once the tab is closed: release the microphone
+        if not _session_active(session_id):
+            recorder.stop()
+            break
+        try:
+            audio = recorder.chunks.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        result = _classify_chunk(audio, settings, match_state)
+        results.put(result)
+
+        # Whole chunks are batched (Whisper's own VAD drops the pauses) so the
+        # segment timestamps still map back to chunk boundaries
+        if result["dur"] > 0 and not result["nonvoice"] and settings["transcription_enabled"]:
+            pending_audio.append(audio)
+            pending_speaker_tags.append(result["is_user"])
+        # Flush at the end of a phrase (a chunk with no speech) so lines are
+        # not cut mid-sentence, or when the batch is full
+        phrase_ended = result["dur"] == 0 and pending_audio
+        if phrase_ended or len(pending_audio) >= TRANSCRIBE_BATCH_CHUNKS:
+            waiting_batch, dropped = _queue_transcript(
+                transcriber, waiting_batch, pending_audio, pending_speaker_tags,
+                settings, results
+            )
+            pending_audio = []
+            pending_speaker_tags = []
+            if dropped:
+                dropped_batches += 1
+                results.put({"rms": 0.0, "is_user": False, "dur": 0.0, "transcript": [],
+                             "embedding_error": None, "nonvoice": False,
+                             "log": f"Transcription falling behind: {dropped_batches} batch(es) dropped"})
+
+    # Flush whatever speech is left when tracking stops. Only the batch being
+    # transcribed is waited for (so its result is published before the thread
+    # exits); anything still queued is cancelled so Stop returns promptly.
+    if pending_audio:
+        _queue_transcript(transcriber, waiting_batch, pending_audio, pending_speaker_tags,
+                          settings, results)
+    transcriber.shutdown(wait=True, cancel_futures=True)
+
+
+def _start_tracking() -> None:
+    """Open the microphone stream and start the background tracking thread."""
+    if st.session_state.capture_started:
+        return
+    # The tracking stream takes over the microphone
+    release_input_monitor(_session_id())
+
+    # Models are loaded here (cached per process): the tracking thread cannot
+    # use Streamlit caching or session state
+    embedder = None
+    if st.session_state.speaker_use_embedding and st.session_state.speaker_embedding is not None:
+        embedder = _load_speaker_embedder()
+    whisper_client = None
+    if st.session_state.transcription_enabled:
+        whisper_client = _load_whisper_client()
+
+    settings = {
+        "voice_profile": st.session_state.voice_profile,
+        "speaker_embedder": embedder,
+        "speaker_embedding": st.session_state.speaker_embedding,
+        "use_embedding": st.session_state.speaker_use_embedding,
+        "similarity_threshold": st.session_state.speaker_similarity_threshold,
+        "transcription_enabled": st.session_state.transcription_enabled,
+        "whisper_client": whisper_client,
+    }
+    # Fresh queue so a worker from a previous session cannot leak stale results
+    results = queue.SimpleQueue()
+    recorder = ChunkRecorder(CHUNK_DURATION, SAMPLE_RATE, st.session_state.selected_device)
+    stop_event = threading.Event()
+    worker = threading.Thread(
+        target=_tracking_worker,
+        args=(recorder, results, stop_event, settings, _session_id()),
+        daemon=True
+    )
+    recorder.start()
+    worker.start()
+
+    st.session_state.tracking_results = results
+    st.session_state.tracking_settings = settings
+    st.session_state.tracking_device = st.session_state.selected_device
+    st.session_state.tracking_recorder = recorder
+    st.session_state.tracking_stop_event = stop_event
+    st.session_state.tracking_worker = worker
+    st.session_state.capture_started = True
+
+
+def _stop_tracking() -> None:
+    """
+    Stop the microphone stream and wait for the tracking thread to exit.
+
+    The thread publishes its last chunk and the transcription in progress on
+    the way out; waiting for it means the next drain picks them up, since the
+    page stops auto-refreshing once tracking ends.
+    """
+    if not st.session_state.capture_started:
+        return
+    st.session_state.tracking_stop_event.set()
+    st.session_state.tracking_recorder.stop()
+    with st.spinner("Finishing up..."):
+        st.session_state.tracking_worker.join()
+    st.session_state.tracking_recorder = None
+    st.session_state.tracking_worker = None
+    st.session_state.capture_started = False
+
+
+def _drain_tracking_results() -> None:
+    """Apply results published by the tracking thread to the session totals."""
+    results = st.session_state.tracking_results
+    while not results.empty():
+        result = results.get()
+        if result["rms"] > SPEECH_THRESHOLD:
+            st.session_state.loud_chunks += 1
+            st.session_state.nonvoice_chunks += result["nonvoice"]
+        if result["dur"] > 0:
+            st.session_state.total_time += result["dur"]
+            if result["is_user"]:
+                st.session_state.user_speaking_time += result["dur"]
+            # Track percentage history for chart
+            current_pct = (st.session_state.user_speaking_time / st.session_state.total_time) * 100
+            st.session_state.percentage_history.append(current_pct)
+            st.session_state.chart_data = None
+        st.session_state.transcription.extend(result["transcript"])
+        if result["embedding_error"]:
+            st.session_state.speaker_embedding_error = result["embedding_error"]
+        st.session_state.debug_logs.append(result["log"])
+
+
+def _sync_tracking_settings() -> None:
+    """Forward sidebar setting changes to the running tracking thread."""
+    settings = st.session_state.tracking_settings
+    if not st.session_state.capture_started or settings is None:
+        return
+    # The recorder is bound to its device, and its thread exits if the browser
+    # disconnects: restart capture on a new device or after a reconnect
+    if (st.session_state.selected_device != st.session_state.tracking_device
+            or not st.session_state.tracking_worker.is_alive()):
+        _stop_tracking()
+        _drain_tracking_results()
+        _start_tracking()
+        return
+    # Load models switched on mid-session before the thread starts using them
+    if (st.session_state.speaker_use_embedding
+            and settings["speaker_embedder"] is None
+            and st.session_state.speaker_embedding is not None):
+        settings["speaker_embedder"] = _load_speaker_embedder()
+    if st.session_state.transcription_enabled and settings["whisper_client"] is None:
+        settings["whisper_client"] = _load_whisper_client()
+    settings["use_embedding"] = st.session_state.speaker_use_embedding
+    settings["similarity_threshold"] = st.session_state.speaker_similarity_threshold
+    settings["transcription_enabled"] = st.session_state.transcription_enabled
 
 
 def render_tracking():
     """Render conversation tracking screen."""
     st.markdown('<p class="main-header">Conversation Tracker</p>', unsafe_allow_html=True)
 
+    # Pick up chunks processed since the last rerun
+    _drain_tracking_results()
+
     # Calculate percentage
     if st.session_state.total_time > 0:
         percentage = (st.session_state.user_speaking_time / st.session_state.total_time) * 100
@@ -293,26 +811,19 @@ def render_tracking():
         color = "#dc3545"  # Red - talking too much
 
     # Big percentage display
-    st.markdown(f"""
-    <div style="text-align: center; padding: 2rem;">
-        <div style="font-size: 5rem; font-weight: 700; color: {color};">
-            {percentage:.0f}%
-        </div>
-        <div style="font-size: 1.2rem; color: #666;">
-            Your speaking time
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(PERCENTAGE_HTML.format(color, percentage), unsafe_allow_html=True)
 
     # Progress bar
     st.progress(min(percentage / 100, 1.0))
 
-    # Line chart of percentage over time
+    # Line chart of percentage over time (rebuilt only when new points arrive)
     if st.session_state.percentage_history:
-        import pandas as pd
-        chart_data = pd.DataFrame({
-            'Your Speaking %': st.session_state.percentage_history
-        })
+        chart_data = st.session_state.chart_data
+        if chart_data is None:
+            chart_data = pd.DataFrame({
+                'Your Speaking %': list(st.session_state.percentage_history)
+            })
+            st.session_state.chart_data = chart_data
         st.line_chart(chart_data, height=200, use_container_width=True)
 
     # Time stats (speaking time only, silence not counted)
@@ -334,133 +845,56 @@ def render_tracking():
     with col_a:
         if not st.session_state.is_tracking:
             if st.button("▶ Start Tracking", type="primary", use_container_width=True):
-                st.session_state.is_tracking = True
                 st.session_state.user_speaking_time = 0.0
                 st.session_state.total_time = 0.0
-                st.session_state.transcription = []
-                st.session_state.percentage_history = []
-                st.session_state.debug_logs = []
+                st.session_state.transcription.clear()
+                st.session_state.percentage_history.clear()
+                st.session_state.chart_data = None
+                st.session_state.debug_logs.clear()
+                st.session_state.loud_chunks = 0
+                st.session_state.nonvoice_chunks = 0
+                _start_tracking()
+                st.session_state.is_tracking = True
                 st.rerun()
         else:
             if st.button("⏹ Stop Tracking", type="secondary", use_container_width=True):
+                _stop_tracking()
                 st.session_state.is_tracking = False
                 st.rerun()
 
     with col_b:
         if st.button("🔄 Reset", use_container_width=True):
+            _stop_tracking()
+            # Discard anything the stopped session published but was not shown
+            st.session_state.tracking_results = queue.SimpleQueue()
             st.session_state.user_speaking_time = 0.0
             st.session_state.total_time = 0.0
-            st.session_state.transcription = []
-            st.session_state.percentage_history = []
-            st.session_state.debug_logs = []
+            st.session_state.transcription.clear()
+            st.session_state.percentage_history.clear()
+            st.session_state.chart_data = None
+            st.session_state.debug_logs.clear()
+            st.session_state.loud_chunks = 0
+            st.session_state.nonvoice_chunks = 0
             st.session_state.is_tracking = False
             st.rerun()
 
     # Audio level when not tracking (always live)
     if not st.session_state.is_tracking:
         st.markdown("**Audio Level**")
-        level = get_audio_level(0.15, st.session_state.selected_device)
-        st.progress(level, text=f"Level: {level:.0%}")
+        _level_meter()
 
-    # Active tracking loop
+    # Active tracking: capture and matching run on a background thread,
+    # the page just refreshes periodically to show new results
     if st.session_state.is_tracking:
         st.info("🎤 Listening... Speak naturally!")
-
-        # Process audio in chunks
-        chunk_duration = 2.0
-        SPEECH_THRESHOLD = 0.005  # Lowered threshold for speech detection
-
-        with st.spinner(""):
-            audio = record_audio(chunk_duration, SAMPLE_RATE, st.session_state.selected_device)
-
-            # Check if there's any speech
-            rms = calculate_rms(audio)
-            audio_max = float(np.max(np.abs(audio)))
-
-            # Log audio stats
-            log_entry = f"RMS: {rms:.4f} | Max: {audio_max:.4f}"
-
-            if rms > SPEECH_THRESHOLD:  # Speech detected
-                # Match against profile (prefer speaker embedding if available)
-                is_user = False
-                confidence = 0.0
-                match_method = "gmm"
-                used_embedding = False
-
-                if st.session_state.speaker_use_embedding and st.session_state.speaker_embedding is not None:
-                    try:
-                        if st.session_state.speaker_embedder is None and HUGGING_FACE_API_KEY:
-                            config = SpeakerEmbeddingConfig(
-                                similarity_threshold=st.session_state.speaker_similarity_threshold
-                            )
-                            st.session_state.speaker_embedder = SpeakerEmbedder(
-                                config=config,
-                                auth_token=HUGGING_FACE_API_KEY
-                            )
-                        if st.session_state.speaker_embedder is not None:
-                            is_user, confidence = match_embedding(
-                                audio,
-                                SAMPLE_RATE,
-                                st.session_state.speaker_embedder,
-                                st.session_state.speaker_embedding,
-                                threshold=st.session_state.speaker_similarity_threshold,
-                            )
-                            match_method = "embedding"
-                            used_embedding = True
-                    except Exception as e:
-                        st.session_state.speaker_embedding_error = f"Speaker embedding error: {str(e)[:80]}"
-                        st.session_state.speaker_embedder = None
-
-                if not used_embedding:
-                    is_user, confidence = match_voice(
-                        audio,
-                        st.session_state.voice_profile,
-                        SAMPLE_RATE
-                    )
-
-                log_entry += f" | SPEECH | {match_method}: {confidence:.2f} | IsYou: {is_user}"
-
-                st.session_state.total_time += chunk_duration
-
-                if is_user:
-                    st.session_state.user_speaking_time += chunk_duration
-
-                # Track percentage history for chart
-                current_pct = (st.session_state.user_speaking_time / st.session_state.total_time) * 100
-                st.session_state.percentage_history.append(current_pct)
-
-                # Optional: transcribe (if enabled)
-                if st.session_state.transcription_enabled:
-                    temp_path = save_to_temp_file(audio, SAMPLE_RATE)
-                    try:
-                        # Initialize client if needed
-                        if st.session_state.whisper_client is None:
-                            st.session_state.whisper_client = WhisperClient(model_size="base.en")
-
-                        result = st.session_state.whisper_client.transcribe(temp_path)
-
-                        if result["success"] and result["text"].strip():
-                            speaker = "You" if is_user else "Other"
-                            st.session_state.transcription.append(f"**{speaker}:** {result['text']}")
-                            log_entry += f" | Text: {result['text'][:30]}..."
-                    except Exception as e:
-                        log_entry += f" | Transcribe error: {str(e)[:30]}"
-                    finally:
-                        os.unlink(temp_path)
-            else:
-                log_entry += " | (silence)"
-
-            # Keep last 20 log entries
-            st.session_state.debug_logs.append(log_entry)
-            st.session_state.debug_logs = st.session_state.debug_logs[-20:]
-
-            st.rerun()
+        st_autorefresh(interval=TRACKING_REFRESH_MS, key="tracking_autorefresh")
 
     # Transcription display
     if st.session_state.transcription:
         st.divider()
         st.markdown("### Transcription")
-        for line in st.session_state.transcription[-10:]:  # Last 10 lines
+        transcript = st.session_state.transcription
+        for line in itertools.islice(transcript, max(len(transcript) - 10, 0), None):  # Last 10 lines
             st.markdown(line)
 
     # Sidebar settings
@@ -499,15 +933,17 @@ def render_tracking():
         )
 
         if st.button("Re-calibrate Voice"):
+            _stop_tracking()
+            st.session_state.is_tracking = False
             st.session_state.voice_profile = None
             try:
                 PROFILE_PATH.unlink(missing_ok=True)
             except OSError:
                 pass
             st.session_state.speaker_embedding = None
-            st.session_state.speaker_embedder = None
             try:
                 SPEAKER_EMBEDDING_PATH.unlink(missing_ok=True)
+                LEGACY_SPEAKER_EMBEDDING_PATH.unlink(missing_ok=True)
             except OSError:
                 pass
             st.rerun()
@@ -522,9 +958,14 @@ def render_tracking():
             help="When enabled, sends audio to OpenAI Whisper for transcription. Disable for fully local operation."
         )
         if st.session_state.transcription_enabled:
+            st.session_state.transcription_error = None
             st.caption("Using local Whisper model (CPU)")
         else:
             st.caption("Transcription disabled")
+        if st.session_state.transcription_error:
+            st.warning(st.session_state.transcription_error)
+
+        _sync_tracking_settings()
 
         st.divider()
         st.markdown("### Guide")
@@ -537,17 +978,15 @@ def render_tracking():
         # Debug logs
         st.divider()
         st.markdown("### Debug Log")
+        if st.session_state.loud_chunks:
+            skipped = st.session_state.nonvoice_chunks / st.session_state.loud_chunks
+            st.metric("Non-voice chunks skipped", f"{skipped:.0%}")
         if st.session_state.debug_logs:
-            for log in reversed(st.session_state.debug_logs[-10:]):
+            for log in itertools.islice(reversed(st.session_state.debug_logs), 10):
                 st.text(log)
         else:
             st.text("No logs yet. Start tracking.")
 
-    # Auto-refresh level meter when not tracking (after sidebar renders)
-    if not st.session_state.is_tracking:
-        time.sleep(0.3)
-        st.rerun()
-
 
 def main():
     """Main app logic."""
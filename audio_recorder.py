@@ -1,32 +1,44 @@
 """Audio recording utilities using sounddevice."""
 
+import io
 import logging
+import queue
+import threading
 import numpy as np
 import sounddevice as sd
 import soundfile as sf
 import tempfile
 import os
-from typing import Optional
+from typing import Hashable, Optional
 
 logger = logging.getLogger(__name__)
 
 
 SAMPLE_RATE = 16000  # 16kHz for Whisper compatibility
 CHANNELS = 1
+RING_DURATION = 30.0  # Seconds of audio kept by the shared input monitor
 
 
-def record_audio(duration: float, sample_rate: int = SAMPLE_RATE, device: Optional[int] = None) -> np.ndarray:
+def record_audio(duration: float, sample_rate: int = SAMPLE_RATE, device: Optional[int] = None,
+                 owner: Hashable = None) -> np.ndarray:
     """
     Record audio for a specified duration.
 
+    Samples come from the shared input stream (see ``get_input_monitor``), so
+    repeated recordings do not reopen the device.
+
     Args:
         duration: Recording duration in seconds
         sample_rate: Sample rate in Hz (default 16kHz for Whisper)
         device: Audio input device ID (None for default)
+        owner: Who holds the shared stream open (see ``get_input_monitor``)
 
     Returns:
-        numpy array of audio samples
+        float32 numpy array of audio samples
     """
+    if sample_rate == SAMPLE_RATE and duration <= RING_DURATION:
+        return get_input_monitor(device, owner).record(duration)
+
     audio = sd.rec(
         int(duration * sample_rate),
         samplerate=sample_rate,
@@ -35,7 +47,224 @@ def record_audio(duration: float, sample_rate: int = SAMPLE_RATE, device: Option
         device=device
     )
     sd.wait()
-    return audio.flatten()
+    # Mono capture: drop the channel axis without copying
+    return audio.reshape(-1)
+
+
+class ChunkRecorder:
+    """
+    Continuously capture fixed-length audio chunks on a background stream.
+
+    The sounddevice callback only copies samples; complete chunks are put on
+    ``chunks`` so slow consumers never block microphone input. The queue is
+    bounded: if the consumer falls behind, the oldest chunk is dropped.
+    """
+
+    def __init__(self, chunk_duration: float = 2.0, sample_rate: int = SAMPLE_RATE,
+                 device: Optional[int] = None, block_duration: float = 0.5,
+                 max_pending: int = 4):
+        """
+        Args:
+            chunk_duration: Length of each delivered chunk in seconds
+            sample_rate: Sample rate in Hz
+            device: Audio input device ID (None for default)
+            block_duration: Length of each stream callback block in seconds
+            max_pending: Chunks buffered before the oldest is dropped
+        """
+        self.sample_rate = sample_rate
+        self.device = device
+        self.chunk_size = int(chunk_duration * sample_rate)
+        self.blocksize = int(block_duration * sample_rate)
+        self.chunks: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.dropped_chunks = 0
+        self._pending: list[np.ndarray] = []
+        self._pending_len = 0
+        self._stream: Optional[sd.InputStream] = None
+
+    def start(self) -> None:
+        """Open the input stream and start delivering chunks."""
+        if self._stream is not None:
+            return
+        self._stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=CHANNELS,
+            dtype=np.float32,
+            device=self.device,
+            blocksize=self.blocksize,
+            callback=self._callback
+        )
+        self._stream.start()
+
+    def stop(self) -> None:
+        """Stop and close the input stream."""
+        if self._stream is None:
+            return
+        try:
+            self._stream.stop()
+            self._stream.close()
+        finally:
+            self._stream = None
+
+    def _callback(self, indata: np.ndarray, frames: int, time_info, status) -> None:
+        if status:
+            logger.debug("Input stream status: %s", status)
+        self._pending.append(indata[:, 0].copy())
+        self._pending_len += frames
+        if self._pending_len >= self.chunk_size:
+            audio = np.concatenate(self._pending)
+            self._deliver(audio[:self.chunk_size])
+            remainder = audio[self.chunk_size:]
+            self._pending = [remainder] if remainder.size else []
+            self._pending_len = remainder.size
+
+    def _deliver(self, chunk: np.ndarray) -> None:
+        # The callback is the only producer, so after dropping the oldest
+        # chunk there is always room for the new one
+        try:
+            self.chunks.put_nowait(chunk)
+        except queue.Full:
+            try:
+                self.chunks.get_nowait()
+            except queue.Empty:
+                pass
+            self.chunks.put_nowait(chunk)
+            self.dropped_chunks += 1
+            logger.warning("Chunk consumer is falling behind; dropped oldest chunk")
+
+
+class InputMonitor:
+    """
+    Keep one input stream open and retain the most recent audio.
+
+    The stream callback writes into a preallocated ring buffer and tracks the
+    latest level, so the level meter reads a cached value and recordings are
+    copied out of the ring instead of opening and closing a PortAudio stream.
+    """
+
+    def __init__(self, device: Optional[int] = None, sample_rate: int = SAMPLE_RATE,
+                 blocksize: int = 1024, buffer_duration: float = RING_DURATION):
+        """
+        Args:
+            device: Audio input device ID (None for default)
+            sample_rate: Sample rate in Hz
+            blocksize: Samples per stream callback
+            buffer_duration: Seconds of audio retained in the ring buffer
+        """
+        self.device = device
+        self.sample_rate = sample_rate
+        self.latest_rms = 0.0
+        self._ring = np.zeros(int(buffer_duration * sample_rate), dtype=np.float32)
+        self._total = 0  # Samples written since the stream started
+        self._new_audio = threading.Condition()
+        self._stream = sd.InputStream(
+            samplerate=sample_rate,
+            channels=CHANNELS,
+            dtype=np.float32,
+            device=device,
+            blocksize=blocksize,
+            callback=self._callback
+        )
+        self._stream.start()
+
+    def close(self) -> None:
+        """Stop and close the input stream."""
+        try:
+            self._stream.stop()
+            self._stream.close()
+        except Exception:
+            logger.debug("Failed to close input stream", exc_info=True)
+
+    @property
+    def level(self) -> float:
+        """Latest level scaled for display (0.0 to 1.0 range, clamped)."""
+        rms = self.latest_rms
+        if np.isnan(rms):
+            return 0.0
+        # Same 50x scaling as get_audio_level
+        return min(max(rms * 50, 0.0), 1.0)
+
+    def record(self, duration: float) -> np.ndarray:
+        """
+        Block until ``duration`` seconds of new audio have arrived and return them.
+
+        Returns:
+            float32 numpy array of audio samples
+        """
+        n = int(duration * self.sample_rate)
+        if n > self._ring.size:
+            raise ValueError(f"Cannot record {duration}s with a {self._ring.size / self.sample_rate:.0f}s buffer")
+        with self._new_audio:
+            start_total = self._total
+            if not self._new_audio.wait_for(lambda: self._total - start_total >= n,
+                                            timeout=duration + 2.0):
+                raise RuntimeError("Timed out waiting for audio input")
+            start = start_total % self._ring.size
+            end = start + n
+            if end <= self._ring.size:
+                return self._ring[start:end].copy()
+            return np.concatenate((self._ring[start:], self._ring[:end - self._ring.size]))
+
+    def _callback(self, indata: np.ndarray, frames: int, time_info, status) -> None:
+        samples = indata[:, 0]
+        with self._new_audio:
+            start = self._total % self._ring.size
+            end = start + frames
+            if end <= self._ring.size:
+                self._ring[start:end] = samples
+            else:
+                split = self._ring.size - start
+                self._ring[start:] = samples[:split]
+                self._ring[:end - self._ring.size] = samples[split:]
+            self._total += frames
+            self._new_audio.notify_all()
+        self.latest_rms = calculate_rms(samples)
+
+
+# One monitor per device, shared by every owner that selected it; a device's
+# stream is closed as soon as its last owner releases it
+_monitors: dict[Optional[int], InputMonitor] = {}
+_monitor_owners: dict[Hashable, Optional[int]] = {}
+_monitor_lock = threading.Lock()
+
+
+def get_input_monitor(device: Optional[int] = None, owner: Hashable = None) -> InputMonitor:
+    """
+    Return the input monitor for ``device``, opening it if needed.
+
+    Args:
+        device: Audio input device ID (None for default)
+        owner: Who keeps the stream open (e.g. a UI session). An owner that
+            switches devices releases its previous one.
+
+    Returns:
+        The shared InputMonitor for the device
+    """
+    with _monitor_lock:
+        previous = _monitor_owners.get(owner, device)
+        _monitor_owners[owner] = device
+        if previous != device:
+            _close_unowned_monitor(previous)
+        monitor = _monitors.get(device)
+        if monitor is None:
+            try:
+                monitor = _monitors[device] = InputMonitor(device, SAMPLE_RATE)
+            except Exception:
+                del _monitor_owners[owner]
+                raise
+        return monitor
+
+
+def release_input_monitor(owner: Hashable = None) -> None:
+    """Drop ``owner``'s claim on its monitor, closing the stream if nobody else uses it."""
+    with _monitor_lock:
+        if owner in _monitor_owners:
+            _close_unowned_monitor(_monitor_owners.pop(owner))
+
+
+def _close_unowned_monitor(device: Optional[int]) -> None:
+    # Caller holds _monitor_lock
+    if device in _monitors and device not in _monitor_owners.values():
+        _monitors.pop(device).close()
 
 
 def get_audio_level(duration: float = 0.1, device: Optional[int] = None) -> float:
@@ -58,7 +287,7 @@ def get_audio_level(duration: float = 0.1, device: Optional[int] = None) -> floa
             device=device
         )
         sd.wait()
-        audio_flat = audio.flatten()
+        audio_flat = audio.reshape(-1)
         if len(audio_flat) == 0:
             return 0.0
         rms = calculate_rms(audio_flat)
@@ -102,10 +331,11 @@ def load_audio(filepath: str) -> tuple[np.ndarray, int]:
         filepath: Path to the audio file
 
     Returns:
-        Tuple of (audio_data, sample_rate)
+        Tuple of (float32 audio_data, sample_rate)
     """
-    audio_data, sample_rate = sf.read(filepath)
-    return audio_data.astype(np.float32), sample_rate
+    # Decode straight to float32 rather than float64 followed by a cast
+    audio_data, sample_rate = sf.read(filepath, dtype="float32")
+    return audio_data, sample_rate
 
 
 def save_to_temp_file(audio_data: np.ndarray, sample_rate: int = SAMPLE_RATE) -> str:
@@ -122,10 +352,27 @@ def save_to_temp_file(audio_data: np.ndarray, sample_rate: int = SAMPLE_RATE) ->
     temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
     temp_path = temp_file.name
     temp_file.close()
-    sf.write(temp_path, audio_data, sample_rate)
+    sf.write(temp_path, audio_data, sample_rate, subtype="PCM_16")
     return temp_path
 
 
+def audio_to_wav_bytes(audio_data: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """
+    Encode audio as an in-memory WAV file.
+
+    Args:
+        audio_data: numpy array of audio samples
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        WAV file contents
+    """
+    buffer = io.BytesIO()
+    # libsndfile scales and converts float samples to 16-bit PCM in C
+    sf.write(buffer, audio_data, sample_rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
 def get_audio_devices() -> list[dict]:
     """Get list of available audio input devices."""
     devices = sd.query_devices()
@@ -143,7 +390,43 @@ def get_audio_devices() -> list[dict]:
 
 def calculate_rms(audio_data: np.ndarray) -> float:
     """Calculate RMS (root mean square) amplitude of audio."""
-    return float(np.sqrt(np.mean(audio_data ** 2)))
+    n = audio_data.size
+    if n == 0:
+        return 0.0
+    # Sum of squares as a single BLAS dot, no squared temporary array
+    return float(np.sqrt(np.dot(audio_data, audio_data) / n))
+
+
+def calculate_rms_and_peak(audio_data: np.ndarray) -> tuple[float, float]:
+    """
+    Calculate RMS and peak absolute amplitude of audio.
+
+    Only read-only SIMD reductions are used (a BLAS dot plus min/max), so no
+    ``np.abs`` or squared temporary is allocated.
+
+    Returns:
+        Tuple of (rms, peak)
+    """
+    if audio_data.size == 0:
+        return 0.0, 0.0
+    peak = max(float(audio_data.max()), -float(audio_data.min()))
+    return calculate_rms(audio_data), peak
+
+
+def calculate_zcr(audio_data: np.ndarray) -> float:
+    """
+    Calculate the zero-crossing rate of audio.
+
+    Crossings are counted around the mean, so a microphone's DC offset does
+    not hide the oscillation of a quiet or low-pitched voice.
+
+    Returns:
+        Fraction of adjacent sample pairs whose sign differs (0.0 to 1.0)
+    """
+    if audio_data.size < 2:
+        return 0.0
+    negative = np.signbit(audio_data - audio_data.mean())
+    return float(np.count_nonzero(negative[1:] != negative[:-1])) / (audio_data.size - 1)
 
 
 def detect_speech(audio_data: np.ndarray, threshold: float = 0.01) -> bool:
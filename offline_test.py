@@ -3,26 +3,35 @@
 from __future__ import annotations
 
 import argparse
+import math
 import os
 from collections import defaultdict
 from typing import Dict, Tuple
 
 import numpy as np
-import torchaudio
+import soundfile as sf
 from pyannote.audio import Pipeline
+from scipy.signal import resample_poly
 from dotenv import load_dotenv
 
-from speaker_id import SpeakerEmbedder, SpeakerEmbeddingConfig, cosine_similarity, load_embedding
+from speaker_id import SpeakerEmbedder, SpeakerEmbeddingConfig, load_embedding
 
 
-def load_audio(filepath: str) -> Tuple[np.ndarray, int]:
-    """Load audio file into mono float32 numpy array."""
-    waveform, sample_rate = torchaudio.load(filepath)
-    if waveform.ndim == 2 and waveform.shape[0] > 1:
-        waveform = waveform.mean(dim=0, keepdim=True)
-    if waveform.ndim == 2:
-        waveform = waveform.squeeze(0)
-    return waveform.numpy().astype(np.float32), int(sample_rate)
+def load_audio(filepath: str, target_rate: int = 16000) -> Tuple[np.ndarray, int]:
+    """Load audio file into mono float32 numpy array at the embedding model's rate."""
+    try:
+        audio, sample_rate = sf.read(filepath, dtype="float32", always_2d=False)
+        if audio.ndim == 2:
+            audio = audio.mean(axis=1)
+    except sf.LibsndfileError:
+        # libsndfile cannot decode AAC (.m4a); fall back to torchaudio's ffmpeg backend
+        import torchaudio
+        waveform, sample_rate = torchaudio.load(filepath)
+        audio = waveform.mean(dim=0).numpy()
+    if sample_rate != target_rate:
+        divisor = math.gcd(int(sample_rate), target_rate)
+        audio = resample_poly(audio, target_rate // divisor, int(sample_rate) // divisor)
+    return np.asarray(audio, dtype=np.float32), target_rate
 
 
 def slice_audio(audio: np.ndarray, sample_rate: int, start: float, end: float) -> np.ndarray:
@@ -36,7 +45,7 @@ def slice_audio(audio: np.ndarray, sample_rate: int, start: float, end: float) -
 def main() -> None:
     parser = argparse.ArgumentParser(description="Offline speaker diarization + match.")
     parser.add_argument("audio_path", help="Path to audio file (e.g., .m4a)")
-    parser.add_argument("--embedding", default="speaker_embedding.json", help="Path to enrolled embedding JSON")
+    parser.add_argument("--embedding", default="speaker_embedding.npy", help="Path to enrolled embedding (.npy or legacy JSON)")
     parser.add_argument("--min-duration", type=float, default=1.0, help="Min segment duration to evaluate")
     parser.add_argument("--threshold", type=float, default=0.65, help="Similarity threshold for 'you'")
     args = parser.parse_args()
@@ -62,6 +71,8 @@ def main() -> None:
     speaker_durations: Dict[str, float] = defaultdict(float)
     speaker_scores: Dict[str, list[float]] = defaultdict(list)
 
+    turns = []
+    segments = []
     for turn, _, speaker in diarization.itertracks(yield_label=True):
         duration = turn.end - turn.start
         if duration < args.min_duration:
@@ -69,10 +80,17 @@ def main() -> None:
         segment_audio = slice_audio(audio, sample_rate, turn.start, turn.end)
         if segment_audio.size == 0:
             continue
-        segment_embedding = embedder.embedding_from_audio(segment_audio, sample_rate)
-        similarity = cosine_similarity(segment_embedding, enrolled_embedding)
+        turns.append((speaker, duration))
+        segments.append(segment_audio)
+
+    print(f"Embedding {len(segments)} segments...")
+    segment_embeddings = embedder.embeddings_from_audio_batch(segments, sample_rate)
+    # All embeddings are unit-norm, so one matrix-vector product gives every
+    # cosine similarity
+    similarities = segment_embeddings @ enrolled_embedding if segments else []
+    for (speaker, duration), similarity in zip(turns, similarities):
         speaker_durations[speaker] += duration
-        speaker_scores[speaker].append(similarity)
+        speaker_scores[speaker].append(float(similarity))
 
     if not speaker_durations:
         raise SystemExit("No diarized segments found. Try lowering --min-duration.")
@@ -5,15 +5,25 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional, Tuple
 import json
+import math
+import warnings
 import numpy as np
 import torch
 from pyannote.audio import Model, Inference
 
 
+MIN_MEAN_SQUARE = 1e-6  # RMS 1e-3; quieter audio is not embedded
+MAX_BATCH_SAMPLES = 16000 * 120  # Padded samples per embedding batch (~2 min at 16 kHz)
+
+
 @dataclass
 class SpeakerEmbeddingConfig:
     model_id: str = "pyannote/embedding"
     similarity_threshold: float = 0.65
+    # int8 dynamic quantization of Linear/LSTM layers (CPU only). Off until
+    # measured: most of the model is SincNet/Conv1d, which it leaves alone
+    quantize: bool = False
+    compile: bool = False  # torch.compile the forward pass (slow first calls)
 
 
 class SpeakerEmbedder:
@@ -23,7 +33,17 @@ class SpeakerEmbedder:
         self.config = config
         self.device = self._select_device()
         self.model = Model.from_pretrained(config.model_id, use_auth_token=auth_token)
+        self.model.eval()
+        # Quantized kernels only exist on CPU
+        if config.quantize and self.device == "cpu":
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear, torch.nn.LSTM}, dtype=torch.qint8
+            )
         self.model.to(self.device)
+        if config.compile:
+            # Compile only forward so Inference still sees a pyannote Model;
+            # speech regions vary in length, so shapes are dynamic
+            self.model.forward = torch.compile(self.model.forward, dynamic=True)
         self.inference = Inference(self.model, window="whole", device=self.device)
 
     @staticmethod
@@ -35,33 +55,120 @@ class SpeakerEmbedder:
         return "cpu"
 
     def embedding_from_audio(self, audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
-        waveform = torch.tensor(audio_data, dtype=torch.float32).to(self.device)
-        if waveform.ndim == 1:
-            waveform = waveform.unsqueeze(0)
-        embedding = self.inference({"waveform": waveform, "sample_rate": sample_rate})
-        return np.asarray(embedding, dtype=np.float32)
+        """Return the L2-normalized float32 speaker embedding of the audio."""
+        # from_numpy shares the buffer; float32 input on CPU is never copied
+        samples = np.ascontiguousarray(audio_data, dtype=np.float32)
+        with torch.inference_mode():
+            waveform = torch.from_numpy(samples).to(self.device)
+            if waveform.ndim == 1:
+                waveform = waveform.unsqueeze(0)
+            embedding = self.inference({"waveform": waveform, "sample_rate": sample_rate})
+        # Inference already returns a float32 ndarray; normalizing casts only if needed
+        return normalize_embedding(embedding)
+
+    def embeddings_from_audio_batch(
+        self, segments: list[np.ndarray], sample_rate: int, batch_size: int = 16,
+        max_batch_samples: int = MAX_BATCH_SAMPLES,
+    ) -> np.ndarray:
+        """
+        Return L2-normalized float32 embeddings of many segments, one row per segment.
+
+        Segments are sorted by length and zero-padded within each batch; the
+        padding is masked out of the model's statistics pooling. A batch holds
+        at most ``batch_size`` segments and ``max_batch_samples`` padded
+        samples, so a segment longer than the budget is embedded on its own. Rows are not
+        bit-identical to ``embedding_from_audio`` on the same segment (frames
+        next to the padding still see zeros); test/test_speaker_id.py checks
+        their cosine similarity.
+        """
+        model_rate = self.model.hparams.sample_rate
+        if sample_rate != model_rate:
+            raise ValueError(f"Expected {model_rate} Hz audio, got {sample_rate} Hz")
+
+        embeddings = [None] * len(segments)
+        order = sorted(range(len(segments)), key=lambda i: len(segments[i]))
+        for batch_idx in _length_batches(order, segments, batch_size, max_batch_samples):
+            max_len = len(segments[batch_idx[-1]])
+            waveforms = np.zeros((len(batch_idx), 1, max_len), dtype=np.float32)
+            weights = np.zeros((len(batch_idx), max_len), dtype=np.float32)
+            for row, idx in enumerate(batch_idx):
+                waveforms[row, 0, :len(segments[idx])] = segments[idx]
+                weights[row, :len(segments[idx])] = 1.0
+
+            with torch.inference_mode(), warnings.catch_warnings():
+                # Stats pooling resamples the per-sample weights to its frame rate
+                warnings.simplefilter("ignore", UserWarning)
+                batch_embeddings = self.model(
+                    torch.from_numpy(waveforms).to(self.device),
+                    weights=torch.from_numpy(weights).to(self.device),
+                )
+            batch_embeddings = batch_embeddings.cpu().numpy()
+            for row, idx in enumerate(batch_idx):
+                embeddings[idx] = normalize_embedding(batch_embeddings[row])
+
+        if not embeddings:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack(embeddings)
+
+
+def _length_batches(order: list[int], segments: list[np.ndarray], batch_size: int,
+                    max_batch_samples: int) -> list[list[int]]:
+    """Split length-sorted segment indices into batches within the size and padding budgets."""
+    batches = []
+    batch = []
+    for idx in order:
+        # Sorted ascending, so this segment sets the padded length of the batch
+        padded = (len(batch) + 1) * len(segments[idx])
+        if batch and (len(batch) == batch_size or padded > max_batch_samples):
+            batches.append(batch)
+            batch = []
+        batch.append(idx)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def normalize_embedding(embedding: np.ndarray) -> np.ndarray:
+    """Scale an embedding to unit L2 norm so cosine similarity is a dot product."""
+    embedding = np.ascontiguousarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(embedding))
+    if norm == 0.0:
+        return embedding
+    return embedding / norm
 
 
 def save_embedding(embedding: np.ndarray, filepath: str) -> None:
-    """Persist embedding to disk as JSON."""
-    payload = {"embedding": embedding.tolist()}
-    with open(filepath, "w") as file:
-        json.dump(payload, file)
+    """Persist embedding to disk as an L2-normalized float32 .npy array."""
+    # Write through a handle so np.save keeps the path as given
+    with open(filepath, "wb") as file:
+        np.save(file, normalize_embedding(embedding))
 
 
 def load_embedding(filepath: str) -> np.ndarray:
-    """Load embedding from disk."""
-    with open(filepath, "r") as file:
+    """Load embedding from disk (.npy, or the older JSON format), L2-normalized."""
+    with open(filepath, "rb") as file:
+        if file.read(1) != b"{":
+            file.seek(0)
+            # save_embedding only writes unit vectors
+            return np.load(file)
+        file.seek(0)
         payload = json.load(file)
-    return np.asarray(payload["embedding"], dtype=np.float32)
+    embedding = np.asarray(payload["embedding"], dtype=np.float32)
+    # Files saved before the flag existed may hold a raw embedding
+    if not payload.get("normalized", False):
+        embedding = normalize_embedding(embedding)
+    return embedding
 
 
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     """Compute cosine similarity between two vectors."""
-    denom = float(np.linalg.norm(a) * np.linalg.norm(b))
-    if denom == 0.0:
+    a = np.ascontiguousarray(a, dtype=np.float32)
+    b = np.ascontiguousarray(b, dtype=np.float32)
+    # Three BLAS dot products and one sqrt instead of two norm() calls
+    denom_sq = float(np.dot(a, a)) * float(np.dot(b, b))
+    if denom_sq == 0.0:
         return 0.0
-    return float(np.dot(a, b) / denom)
+    return float(np.dot(a, b)) / math.sqrt(denom_sq)
 
 
 def match_embedding(
@@ -71,9 +178,20 @@ def match_embedding(
     enrolled_embedding: np.ndarray,
     threshold: Optional[float] = None,
 ) -> Tuple[bool, float]:
-    """Compare audio segment embedding against enrolled voice."""
+    """
+    Compare audio segment embedding against enrolled voice.
+
+    ``enrolled_embedding`` must be unit-norm, as returned by
+    ``embedding_from_audio`` and ``load_embedding``.
+    """
+    # Near-silent audio carries no speaker information: skip the model
+    samples = np.ascontiguousarray(audio_data, dtype=np.float32).reshape(-1)
+    if samples.size == 0 or float(np.dot(samples, samples)) < MIN_MEAN_SQUARE * samples.size:
+        return False, 0.0
+
     similarity_threshold = threshold if threshold is not None else embedder.config.similarity_threshold
     current_embedding = embedder.embedding_from_audio(audio_data, sample_rate)
-    similarity = cosine_similarity(current_embedding, enrolled_embedding)
+    # Both vectors are unit-norm, so cosine similarity is a plain dot product
+    similarity = float(np.dot(current_embedding, enrolled_embedding))
     confidence = max(0.0, min(1.0, (similarity + 1.0) / 2.0))
     return similarity >= similarity_threshold, confidence
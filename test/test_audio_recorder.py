@@ -0,0 +1,141 @@
+"""Unit tests for the streaming recorders, driven through their stream callbacks.
+
+No audio device is opened: InputMonitor's stream is replaced with a stub, and
+ChunkRecorder only opens one in start(), which these tests never call.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Allow imports from project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# The module needs sounddevice and soundfile installed, not a device
+audio_recorder = pytest.importorskip("audio_recorder")
+
+
+class _IdleStream:
+    """Stand-in for sd.InputStream that never calls back on its own."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _feed(callback, samples: np.ndarray, blocksize: int) -> None:
+    """Deliver samples to a stream callback in (frames, channels) blocks."""
+    for start in range(0, samples.size, blocksize):
+        block = samples[start:start + blocksize].reshape(-1, 1)
+        callback(block, block.shape[0], None, None)
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    """InputMonitor with a 1-second ring at 1 kHz and no real stream."""
+    monkeypatch.setattr(audio_recorder.sd, "InputStream", _IdleStream)
+    return audio_recorder.InputMonitor(sample_rate=1000, buffer_duration=1.0)
+
+
+def test_monitor_record_across_ring_wrap(monitor):
+    """A recording that straddles the end of the ring comes back in order."""
+    # Leave the write position 200 samples before the end of the ring
+    _feed(monitor._callback, np.zeros(800, dtype=np.float32), blocksize=100)
+
+    expected = np.arange(1, 601, dtype=np.float32)
+    feeder = threading.Timer(0.1, _feed, args=(monitor._callback, expected, 150))
+    feeder.start()
+    try:
+        recorded = monitor.record(0.6)
+    finally:
+        feeder.join()
+
+    np.testing.assert_array_equal(recorded, expected)
+    assert monitor.latest_rms > 0
+
+
+def test_monitor_record_times_out_without_audio(monitor):
+    """record() gives up instead of blocking forever on a silent stream."""
+    with pytest.raises(RuntimeError):
+        monitor.record(0.01)
+
+
+def test_monitor_record_longer_than_ring(monitor):
+    """Requests longer than the ring are rejected up front."""
+    with pytest.raises(ValueError):
+        monitor.record(2.0)
+
+
+def test_chunk_recorder_splits_blocks_into_chunks():
+    """Blocks that do not line up with chunk boundaries are re-cut exactly."""
+    recorder = audio_recorder.ChunkRecorder(chunk_duration=1.0, sample_rate=100)
+    samples = np.arange(250, dtype=np.float32)
+    _feed(recorder._callback, samples, blocksize=30)
+
+    np.testing.assert_array_equal(recorder.chunks.get_nowait(), samples[:100])
+    np.testing.assert_array_equal(recorder.chunks.get_nowait(), samples[100:200])
+    assert recorder.chunks.empty()
+    assert recorder._pending_len == 50
+
+
+def test_chunk_recorder_drops_oldest_when_full():
+    """A slow consumer loses the oldest chunks, never the newest."""
+    recorder = audio_recorder.ChunkRecorder(chunk_duration=1.0, sample_rate=100,
+                                            max_pending=2)
+    samples = np.arange(400, dtype=np.float32)
+    _feed(recorder._callback, samples, blocksize=100)
+
+    assert recorder.dropped_chunks == 2
+    np.testing.assert_array_equal(recorder.chunks.get_nowait(), samples[200:300])
+    np.testing.assert_array_equal(recorder.chunks.get_nowait(), samples[300:400])
+
+
+def test_input_monitors_are_shared_per_device_and_released(monkeypatch):
+    """Owners of one device share a stream; it closes when the last owner lets go."""
+    monkeypatch.setattr(audio_recorder.sd, "InputStream", _IdleStream)
+    monkeypatch.setattr(audio_recorder, "_monitors", {})
+    monkeypatch.setattr(audio_recorder, "_monitor_owners", {})
+    closed = []
+    monkeypatch.setattr(audio_recorder.InputMonitor, "close",
+                        lambda self: closed.append(self.device))
+
+    first = audio_recorder.get_input_monitor(1, owner="a")
+    assert audio_recorder.get_input_monitor(1, owner="b") is first
+
+    # Switching devices keeps device 1 open while "b" still uses it
+    second = audio_recorder.get_input_monitor(2, owner="a")
+    assert second is not first
+    assert closed == []
+
+    audio_recorder.release_input_monitor("b")
+    assert closed == [1]
+    audio_recorder.release_input_monitor("a")
+    assert closed == [1, 2]
+    assert audio_recorder._monitors == {}
+    # Releasing an owner that holds nothing is harmless
+    audio_recorder.release_input_monitor("a")
+
+
+def test_zcr_ignores_dc_offset():
+    """A voiced signal riding on a DC offset keeps its zero-crossing rate."""
+    t = np.arange(16000) / 16000
+    voiced = (0.02 * np.sin(2 * np.pi * 120 * t)).astype(np.float32)
+
+    expected = audio_recorder.calculate_zcr(voiced)
+    # Offset larger than the amplitude: the raw signal never crosses zero
+    assert audio_recorder.calculate_zcr(voiced + np.float32(0.05)) == pytest.approx(expected)
+    assert expected == pytest.approx(2 * 120 / 16000, rel=0.05)
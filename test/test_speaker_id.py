@@ -0,0 +1,94 @@
+"""Unit tests for speaker embedding storage and batched embedding."""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Allow imports from project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# The module needs torch and pyannote.audio installed
+speaker_id = pytest.importorskip("speaker_id")
+
+# Batch rows may differ from single-segment embeddings by padding effects only
+BATCH_MIN_SIMILARITY = 0.98
+
+
+def test_save_and_load_embedding_npy(tmp_path):
+    """Embeddings round-trip through .npy as unit-norm float32."""
+    path = tmp_path / "speaker_embedding.npy"
+    speaker_id.save_embedding(np.array([3.0, 4.0]), str(path))
+
+    loaded = speaker_id.load_embedding(str(path))
+    assert loaded.dtype == np.float32
+    np.testing.assert_allclose(loaded, [0.6, 0.8], rtol=1e-6)
+
+
+@pytest.mark.parametrize("payload, expected", [
+    # Written before the normalized flag existed: raw embedding
+    ({"embedding": [3.0, 4.0]}, [0.6, 0.8]),
+    ({"embedding": [3.0, 4.0], "normalized": False}, [0.6, 0.8]),
+    # Already normalized when saved: loaded as is
+    ({"embedding": [0.6, 0.8], "normalized": True}, [0.6, 0.8]),
+])
+def test_load_legacy_json_embedding(tmp_path, payload, expected):
+    """Older JSON embedding files still load, normalized."""
+    path = tmp_path / "speaker_embedding.json"
+    path.write_text(json.dumps(payload))
+
+    loaded = speaker_id.load_embedding(str(path))
+    assert loaded.dtype == np.float32
+    np.testing.assert_allclose(loaded, expected, rtol=1e-6)
+
+
+def test_length_batches_respect_padding_budget():
+    """Batches stay within the padded-sample budget; overlong segments go alone."""
+    segments = [np.zeros(n, dtype=np.float32) for n in (5, 50, 3, 200, 7, 40)]
+    order = sorted(range(len(segments)), key=lambda i: len(segments[i]))
+
+    batches = speaker_id._length_batches(order, segments, batch_size=16, max_batch_samples=100)
+
+    assert batches == [[2, 0, 4], [5, 1], [3]]
+    for batch in batches[:-1]:
+        assert len(batch) * len(segments[batch[-1]]) <= 100
+    assert speaker_id._length_batches(order, segments, batch_size=2,
+                                      max_batch_samples=100) == [[2, 0], [4, 5], [1], [3]]
+
+
+@pytest.mark.skipif(not os.getenv("HUGGING_FACE_API_KEY"),
+                    reason="HUGGING_FACE_API_KEY is needed to download pyannote/embedding")
+def test_batch_embeddings_match_single_segment():
+    """Padded, weighted batch rows agree with embedding each segment on its own."""
+    from test_voice_discrimination import (
+        SPEAKER_A_PATH, SPEAKER_A_URL, TARGET_SR, _download_if_missing, _load_mono_16k,
+    )
+
+    _download_if_missing(SPEAKER_A_URL, SPEAKER_A_PATH)
+    audio = _load_mono_16k(SPEAKER_A_PATH)
+    # Different lengths in one batch, so all but the longest are zero-padded
+    segments = []
+    offset = TARGET_SR * 10
+    for seconds in (1.0, 1.7, 2.5, 4.0):
+        length = int(seconds * TARGET_SR)
+        segments.append(audio[offset:offset + length])
+        offset += length
+
+    embedder = speaker_id.SpeakerEmbedder(
+        config=speaker_id.SpeakerEmbeddingConfig(),
+        auth_token=os.environ["HUGGING_FACE_API_KEY"],
+    )
+    batch = embedder.embeddings_from_audio_batch(segments, TARGET_SR, batch_size=len(segments))
+
+    for segment, row in zip(segments, batch):
+        single = embedder.embedding_from_audio(segment, TARGET_SR)
+        similarity = speaker_id.cosine_similarity(single, row)
+        assert similarity >= BATCH_MIN_SIMILARITY, (
+            f"{len(segment) / TARGET_SR:.1f}s segment: batch vs single similarity {similarity:.4f}"
+        )
@@ -6,7 +6,8 @@ profile from Speaker A, then checks that:
   2. Chunks of Speaker B are recognised as "not you"
   3. An interleaved (spliced) mix is scored correctly per-chunk
 
-Audio fixtures are cached in test/fixtures/ so they are only downloaded once.
+Audio fixtures are cached in test/fixtures/ so they are only downloaded (and
+decoded) once.
 """
 
 from __future__ import annotations
@@ -50,7 +51,15 @@ def _download_if_missing(url: str, dest: Path) -> None:
 
 
 def _load_mono_16k(path: Path) -> np.ndarray:
-    """Load audio file, convert to mono float32 at 16 kHz."""
+    """Load audio file, convert to mono float32 at 16 kHz.
+
+    The decoded samples are cached next to the download, so reruns skip
+    MP3 decoding and resampling.
+    """
+    cache_path = path.with_suffix(f".{TARGET_SR}.npy")
+    if cache_path.exists() and cache_path.stat().st_mtime >= path.stat().st_mtime:
+        return np.load(cache_path)
+
     waveform, sr = torchaudio.load(str(path))
     # To mono
     if waveform.shape[0] > 1:
@@ -58,16 +67,16 @@ def _load_mono_16k(path: Path) -> np.ndarray:
     # Resample
     if sr != TARGET_SR:
         waveform = torchaudio.transforms.Resample(sr, TARGET_SR)(waveform)
-    return waveform.squeeze(0).numpy().astype(np.float32)
+    audio = waveform.squeeze(0).numpy().astype(np.float32)
+    np.save(cache_path, audio)
+    return audio
 
 
-def _chunk_audio(audio: np.ndarray, chunk_seconds: float = 3.0) -> list[np.ndarray]:
-    """Split audio into fixed-length chunks, dropping the last short one."""
+def _chunk_audio(audio: np.ndarray, chunk_seconds: float = 3.0) -> np.ndarray:
+    """Split audio into fixed-length chunks (rows of a view), dropping the last short one."""
     chunk_len = int(chunk_seconds * TARGET_SR)
-    chunks = []
-    for start in range(0, len(audio) - chunk_len + 1, chunk_len):
-        chunks.append(audio[start : start + chunk_len])
-    return chunks
+    num_chunks = len(audio) // chunk_len
+    return audio[: num_chunks * chunk_len].reshape(num_chunks, chunk_len)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,53 @@
+"""Regression test: VoiceProfile.score_samples must agree with sklearn's GMM scoring.
+
+The iOS parity fixtures use sklearn as the reference, so this is the only test
+that exercises the precomputed diagonal-GMM path used by match_voice.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Allow imports from project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from voice_matcher import create_voice_profile, extract_mfcc, VoiceProfile
+
+SAMPLE_RATE = 16000
+
+
+def _synthetic_voice(seconds: float, f0: float, seed: int) -> np.ndarray:
+    """Harmonic tone with a wobbling pitch plus noise, loud enough to pass the RMS gate."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = f0 * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    audio = sum(np.sin(k * phase) / k for k in range(1, 6))
+    audio += 0.05 * rng.standard_normal(t.size)
+    return (0.1 * audio).astype(np.float32)
+
+
+def test_score_samples_matches_sklearn():
+    """Precomputed scoring equals gmm.score_samples, also after a JSON round trip."""
+    profile = create_voice_profile(_synthetic_voice(10.0, 140.0, seed=0), SAMPLE_RATE)
+    # Same speaker and a clearly different one, so both tails are covered
+    same = extract_mfcc(_synthetic_voice(3.0, 140.0, seed=1), SAMPLE_RATE, num_mfcc=20)
+    other = extract_mfcc(_synthetic_voice(3.0, 260.0, seed=2), SAMPLE_RATE, num_mfcc=20)
+
+    reloaded = VoiceProfile.from_dict(json.loads(json.dumps(profile.to_dict())))
+
+    for features in (same, other):
+        expected = profile.gmm.score_samples(features)
+        np.testing.assert_allclose(profile.score_samples(features), expected,
+                                   rtol=1e-10, atol=1e-9)
+        np.testing.assert_allclose(reloaded.score_samples(features), expected,
+                                   rtol=1e-10, atol=1e-9)
+
+
+if __name__ == "__main__":
+    test_score_samples_matches_sklearn()
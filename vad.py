@@ -0,0 +1,43 @@
+"""Voice activity detection using the Silero VAD model bundled with faster-whisper."""
+
+import numpy as np
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+# Tuned for short chunks: the defaults pad each region by 400 ms, which would
+# mark nearly every 2-second chunk as speech from start to end
+VAD_OPTIONS = VadOptions(
+    min_speech_duration_ms=200,
+    min_silence_duration_ms=100,
+    speech_pad_ms=30,
+)
+
+
+def speech_regions(audio: np.ndarray) -> list[tuple[int, int]]:
+    """
+    Find the regions of a chunk that contain speech.
+
+    Args:
+        audio: float32 numpy array of 16kHz mono samples
+
+    Returns:
+        List of (start, end) sample indices, empty if there is no speech
+    """
+    timestamps = get_speech_timestamps(audio, VAD_OPTIONS)
+    return [(ts["start"], ts["end"]) for ts in timestamps]
+
+
+def speech_only(audio: np.ndarray, regions: list[tuple[int, int]]) -> np.ndarray:
+    """
+    Keep only the speech regions of a chunk.
+
+    Args:
+        audio: numpy array of audio samples
+        regions: (start, end) sample indices from speech_regions()
+
+    Returns:
+        The speech samples; a view of ``audio`` when there is a single region
+    """
+    if len(regions) == 1:
+        start, end = regions[0]
+        return audio[start:end]
+    return np.concatenate([audio[start:end] for start, end in regions])
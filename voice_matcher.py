@@ -1,9 +1,10 @@
 """Voice feature extraction and matching for speaker identification."""
 
+import functools
 import numpy as np
-from scipy.fft import fft
+from scipy.fft import rfft
 from scipy.signal import spectrogram
-from scipy.special import expit
+from scipy.special import expit, logsumexp
 from typing import Optional, Tuple
 import json
 from sklearn.mixture import GaussianMixture
@@ -16,6 +17,37 @@ class VoiceProfile:
         self.gmm = gmm
         self.threshold_score = threshold_score
 
+        # Diagonal-covariance log-likelihood terms that do not depend on the
+        # input, so scoring is two matrix products and a logsumexp
+        precisions = gmm.precisions_cholesky_ ** 2
+        num_features = gmm.means_.shape[1]
+        self._precisions_t = precisions.T
+        self._weighted_means_t = (gmm.means_ * precisions).T
+        self._log_const = (
+            np.log(gmm.weights_)
+            + np.sum(np.log(gmm.precisions_cholesky_), axis=1)
+            - 0.5 * (num_features * np.log(2 * np.pi)
+                     + np.sum(gmm.means_ ** 2 * precisions, axis=1))
+        )
+
+    def score_samples(self, features: np.ndarray) -> np.ndarray:
+        """
+        Per-frame log-likelihood under the GMM.
+
+        Same result as ``gmm.score_samples`` without sklearn's input
+        validation, which dominates the cost on a 2-second chunk.
+
+        Args:
+            features: 2D array of features (num_frames x num_features)
+
+        Returns:
+            1D array of log-likelihoods, one per frame
+        """
+        log_prob = (self._log_const
+                    + features @ self._weighted_means_t
+                    - 0.5 * ((features ** 2) @ self._precisions_t))
+        return logsumexp(log_prob, axis=1)
+
     def to_dict(self) -> dict:
         """Convert profile to dictionary for serialization."""
         return {
@@ -49,26 +81,51 @@ def _mel_to_hz(mel: float) -> float:
     return 700 * (10 ** (mel / 2595) - 1)
 
 
+@functools.lru_cache(maxsize=8)
 def _create_mel_filterbank(num_filters: int, fft_size: int,
                            sample_rate: int) -> np.ndarray:
-    """Create a Mel filterbank matrix."""
+    """Create a Mel filterbank matrix (memoized and read-only)."""
     low_freq_mel = 0
     high_freq_mel = _hz_to_mel(sample_rate / 2)
 
     mel_points = np.linspace(low_freq_mel, high_freq_mel, num_filters + 2)
-    hz_points = np.array([_mel_to_hz(m) for m in mel_points])
+    hz_points = _mel_to_hz(mel_points)
 
     bin_points = np.floor((fft_size + 1) * hz_points / sample_rate).astype(int)
 
-    filterbank = np.zeros((num_filters, fft_size // 2 + 1))
+    # Triangles for all filters at once: one row per filter, one column per bin
+    bins = np.arange(fft_size // 2 + 1)[np.newaxis, :]
+    left = bin_points[:-2, np.newaxis]
+    center = bin_points[1:-1, np.newaxis]
+    right = bin_points[2:, np.newaxis]
+    # Empty slopes (repeated bin points) divide by zero but are masked out
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rising = (bins - left) / (center - left)
+        falling = (right - bins) / (right - center)
+    filterbank = np.where((bins >= left) & (bins < center), rising,
+                          np.where((bins >= center) & (bins < right), falling, 0.0))
+
+    # Shared by every caller through the cache: fail loudly on modification
+    filterbank.setflags(write=False)
+    return filterbank
 
-    for i in range(num_filters):
-        for j in range(bin_points[i], bin_points[i + 1]):
-            filterbank[i, j] = (j - bin_points[i]) / (bin_points[i + 1] - bin_points[i])
-        for j in range(bin_points[i + 1], bin_points[i + 2]):
-            filterbank[i, j] = (bin_points[i + 2] - j) / (bin_points[i + 2] - bin_points[i + 1])
 
-    return filterbank
+@functools.lru_cache(maxsize=8)
+def _hamming_window(frame_size: int) -> np.ndarray:
+    """Create a Hamming window (memoized and read-only)."""
+    window = np.hamming(frame_size)
+    window.setflags(write=False)
+    return window
+
+
+@functools.lru_cache(maxsize=8)
+def _create_dct_matrix(num_mfcc: int, num_filters: int) -> np.ndarray:
+    """Create a DCT-II matrix (memoized and read-only)."""
+    i = np.arange(num_mfcc)[:, np.newaxis]
+    j = np.arange(num_filters)[np.newaxis, :]
+    dct_matrix = np.cos(np.pi * i * (j + 0.5) / num_filters)
+    dct_matrix.setflags(write=False)
+    return dct_matrix
 
 
 def extract_mfcc(audio_data: np.ndarray, sample_rate: int = 16000,
@@ -98,37 +155,44 @@ def extract_mfcc(audio_data: np.ndarray, sample_rate: int = 16000,
         audio_data = np.pad(audio_data, (0, frame_size - len(audio_data)))
         num_frames = 1
 
-    frames = np.zeros((num_frames, frame_size))
-    for i in range(num_frames):
-        start = i * hop_size
-        frames[i] = audio_data[start:start + frame_size]
+    # Overlapping frames as a strided view; windowing makes the float64 copy
+    frames = np.lib.stride_tricks.sliding_window_view(audio_data, frame_size)[::hop_size]
 
     # Apply Hamming window
-    window = np.hamming(frame_size)
-    frames = frames * window
-
-    # FFT and power spectrum
-    fft_result = fft(frames, axis=1)
-    power_spectrum = np.abs(fft_result[:, :frame_size // 2 + 1]) ** 2
+    frames = frames * _hamming_window(frame_size)
+
+    # Real FFT of all frames at once: only the frame_size // 2 + 1
+    # non-negative frequency bins are computed
+    # (the windowed frames are a private copy, so scipy may reuse them)
+    fft_result = rfft(frames, axis=1, overwrite_x=True)
+    # |X|^2 without abs()'s hypot and sqrt (same form as the Swift port);
+    # the imaginary part is squared inside the spectrum's own buffer, so the
+    # only new array is the power spectrum itself
+    power_spectrum = np.square(fft_result.real)
+    power_spectrum += np.square(fft_result.imag, out=fft_result.imag)
 
     # Mel filterbank
     mel_filterbank = _create_mel_filterbank(26, frame_size, sample_rate)
     mel_spectrum = np.dot(power_spectrum, mel_filterbank.T)
-    mel_spectrum = np.where(mel_spectrum == 0, 1e-10, mel_spectrum)
-    mel_spectrum = np.log(mel_spectrum)
+    # Guard exact zeros only (same as the Swift port), then log in place
+    np.copyto(mel_spectrum, 1e-10, where=mel_spectrum == 0)
+    np.log(mel_spectrum, out=mel_spectrum)
 
     # DCT to get MFCCs
-    num_filters = mel_spectrum.shape[1]
-    dct_matrix = np.zeros((num_mfcc, num_filters))
-    for i in range(num_mfcc):
-        for j in range(num_filters):
-            dct_matrix[i, j] = np.cos(np.pi * i * (j + 0.5) / num_filters)
-
+    dct_matrix = _create_dct_matrix(num_mfcc, mel_spectrum.shape[1])
     mfcc = np.dot(mel_spectrum, dct_matrix.T)
 
     return mfcc
 
 
+@functools.lru_cache(maxsize=8)
+def _frequency_bins(num_bins: int, sample_rate: int) -> np.ndarray:
+    """Evenly spaced bin frequencies up to Nyquist (memoized and read-only)."""
+    freqs = np.linspace(0, sample_rate / 2, num_bins)
+    freqs.setflags(write=False)
+    return freqs
+
+
 def extract_spectral_features(audio_data: np.ndarray,
                               sample_rate: int = 16000) -> tuple[float, float]:
     """
@@ -141,12 +205,12 @@ def extract_spectral_features(audio_data: np.ndarray,
     Returns:
         Tuple of (spectral_centroid, spectral_rolloff)
     """
-    # Compute magnitude spectrum
-    fft_result = np.abs(fft(audio_data))
-    fft_result = fft_result[:len(fft_result) // 2]
+    # Compute magnitude spectrum (real FFT: negative frequencies are never computed)
+    fft_result = np.abs(rfft(audio_data))
+    fft_result = fft_result[:len(audio_data) // 2]
 
     # Frequency bins
-    freqs = np.linspace(0, sample_rate / 2, len(fft_result))
+    freqs = _frequency_bins(len(fft_result), sample_rate)
 
     # Spectral centroid
     if np.sum(fft_result) > 0:
@@ -222,9 +286,10 @@ def match_voice(audio_segment: np.ndarray, profile: VoiceProfile,
     Returns:
         Tuple of (is_match, confidence_score)
     """
-    # Skip very quiet segments
-    rms = np.sqrt(np.mean(audio_segment ** 2))
-    if rms < 0.01:
+    # Skip very quiet segments (RMS < 0.01, compared squared: one dot
+    # product, no squared copy of the audio and no sqrt)
+    samples = np.ravel(audio_segment)
+    if samples.size == 0 or float(np.dot(samples, samples)) < 1e-4 * samples.size:
         return False, 0.0
 
     # Extract features from segment
@@ -235,7 +300,7 @@ def match_voice(audio_segment: np.ndarray, profile: VoiceProfile,
         return False, 0.0
 
     # Compute log-likelihood of the segment under the GMM
-    scores = profile.gmm.score_samples(mfcc)
+    scores = profile.score_samples(mfcc)
     avg_score = np.mean(scores)
     
     # Distance from threshold
@@ -1,9 +1,10 @@
-"""Local Whisper client using standard openai-whisper."""
+"""Local Whisper client using faster-whisper (CTranslate2)."""
 
-import whisper
+import ctranslate2
 import os
 import logging
-import torch
+import numpy as np
+from faster_whisper import WhisperModel
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,56 +13,70 @@ logger = logging.getLogger(__name__)
 class WhisperClient:
     """Client for local Whisper transcription."""
 
-    def __init__(self, model_size: str = "base.en", device: str | None = None, compute_type: str = "int8"):
+    def __init__(self, model_size: str = "base.en", device: str | None = None,
+                 compute_type: str | None = None):
         """
         Initialize the local Whisper model.
 
         Args:
             model_size: Size of the model (tiny, base, small, medium, large)
-            device: "cpu", "cuda", or "mps". None to auto-detect.
-            compute_type: Ignored for standard whisper (handled internally/dtype)
+            device: "cpu" or "cuda". None to auto-detect.
+            compute_type: CTranslate2 weight/compute precision. None picks
+                float16 on CUDA and int8 on CPU (~4x faster than the reference
+                PyTorch model)
         """
         # Auto-detect device only when not explicitly set
+        # (CTranslate2 has no Metal backend, so Apple Silicon runs on CPU)
         if device is None:
-            if torch.backends.mps.is_available():
-                device = "mps"
-                logger.info("MPS (Metal) detected. Using GPU acceleration.")
-            elif torch.cuda.is_available():
+            if ctranslate2.get_cuda_device_count() > 0:
                 device = "cuda"
                 logger.info("CUDA detected. Using GPU acceleration.")
             else:
                 device = "cpu"
+        if compute_type is None:
+            compute_type = "float16" if device == "cuda" else "int8"
 
         self.device = device
-        logger.info(f"Loading Whisper model: {model_size} on {self.device}...")
+        logger.info(f"Loading Whisper model: {model_size} on {self.device} ({compute_type})...")
 
         try:
-            self.model = whisper.load_model(model_size, device=self.device)
+            self.model = WhisperModel(
+                model_size,
+                device=self.device,
+                compute_type=compute_type,
+                cpu_threads=os.cpu_count() or 0
+            )
             logger.info("Whisper model loaded successfully.")
         except Exception:
             logger.error(f"Failed to load Whisper model on {self.device}")
             raise
 
-    def transcribe(self, audio_filepath: str) -> dict:
+    def transcribe(self, audio: str | np.ndarray) -> dict:
         """
-        Transcribe audio file using local Whisper model.
+        Transcribe audio using local Whisper model.
 
-       Args:
-            audio_filepath: Path to the audio file (WAV, MP3, etc.)
+        Args:
+            audio: Path to the audio file (WAV, MP3, etc.), or a float32
+                numpy array of 16kHz mono samples (skips disk and decoding)
 
         Returns:
             Dictionary with transcription result
         """
         try:
-            # Transcribe
-            result = self.model.transcribe(
-                audio_filepath,
-                fp16=False # consistent for CPU/MPS compatibility
+            # Transcribe (greedy decoding, silence skipped by the built-in VAD)
+            segment_iter, _info = self.model.transcribe(
+                audio,
+                beam_size=1,
+                vad_filter=True
             )
-            
-            text = result.get("text", "").strip()
-            segments = result.get("segments", [])
-            
+
+            # Segments are generated lazily; decoding happens here
+            segments = [
+                {"start": seg.start, "end": seg.end, "text": seg.text}
+                for seg in segment_iter
+            ]
+            text = "".join(seg["text"] for seg in segments).strip()
+
             return {
                 "text": text,
                 "segments": segments,